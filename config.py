@@ -2,7 +2,8 @@ import os
 import sqlite3
 import requests
 import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from geoip2 import database as gdb
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -41,6 +42,9 @@ def init_db():
             last_check TEXT,
             is_active INTEGER DEFAULT 1
         )''')
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(proxies)')}
+        if 'latency' not in columns:
+            conn.execute('ALTER TABLE proxies ADD COLUMN latency INTEGER')
         conn.commit()
 
 def save_custom_sources(sources):
@@ -57,27 +61,31 @@ def load_config():
     if os.path.exists(CONFIG_PATH):
         with open(CONFIG_PATH, 'r') as f:
             return json.load(f)
-    return {'update_threads': 100, 'check_threads': 50, 'custom_sources': []}
+    return {'update_threads': 100, 'check_threads': 50, 'custom_sources': [],
+            'check_time_limit': 0, 'check_countries': []}
 
-def detect_proxy_type(proxy):
+def detect_proxy_type(proxy, timeout=5):
     proxy = proxy.split('://')[-1].split('@')[-1]
     for ptype in ['socks5', 'socks4', 'https', 'http']:
         try:
             test_url = 'https://www.google.com' if ptype != 'http' else 'http://www.google.com'
-            requests.get(test_url, proxies={'http': f"{ptype}://{proxy}"}, timeout=5)
+            requests.get(test_url, proxies={'http': f"{ptype}://{proxy}"}, timeout=timeout)
             return ptype
         except:
             continue
     return None
 
-def check_proxy(proxy, reader=None):
-    ptype = detect_proxy_type(proxy)
+def check_proxy(proxy, reader=None, timeout=10):
+    # Country is None when the probe fails so the stored country is kept
+    ptype = detect_proxy_type(proxy, timeout / 2)
     if not ptype:
-        return (proxy, None, 'Unknown', 0)
+        return (proxy, None, None, 0, None)
     
     try:
         test_url = 'https://www.google.com' if ptype != 'http' else 'http://www.google.com'
-        requests.get(test_url, proxies={'http': f"{ptype}://{proxy}"}, timeout=10)
+        started = time.monotonic()
+        requests.get(test_url, proxies={'http': f"{ptype}://{proxy}"}, timeout=timeout)
+        latency = int((time.monotonic() - started) * 1000)
         
         country = 'Unknown'
         if reader:
@@ -86,9 +94,9 @@ def check_proxy(proxy, reader=None):
                 country = reader.city(ip).country.names.get('en', 'Unknown')
             except:
                 pass
-        return (proxy, ptype, country, 1)
+        return (proxy, ptype, country, 1, latency)
     except:
-        return (proxy, ptype, 'Unknown', 0)
+        return (proxy, ptype, None, 0, None)
 
 def get_random_proxy(region=None, active_only=True):
     query = 'SELECT proxy FROM proxies'
@@ -108,42 +116,79 @@ def get_random_proxy(region=None, active_only=True):
         row = conn.execute(query + ' ORDER BY RANDOM() LIMIT 1', params).fetchone()
         return row['proxy'] if row else None
 
-def check_all_proxies(threads=50, progress_callback=None):
+def get_check_queue(countries=None):
+    # Requested countries first, then previously active by latency, then the stalest checks
+    countries = [c.lower() for c in countries or []]
+    placeholders = ', '.join('?' * len(countries)) or "''"
+    query = f'''
+        SELECT proxy FROM proxies
+        ORDER BY LOWER(country) IN ({placeholders}) DESC,
+                 is_active DESC,
+                 latency IS NULL, latency ASC,
+                 last_check IS NOT NULL, last_check ASC
+    '''
+    with get_db_connection() as conn:
+        return [row['proxy'] for row in conn.execute(query, countries)]
+
+def check_all_proxies(threads=50, progress_callback=None, time_limit=None, countries=None):
+    # Returns (active, checked, total); checked < total when the time limit cut the sweep short
     reader = gdb.Reader(GEOIP_PATH) if os.path.exists(GEOIP_PATH) else None
+    deadline = time.monotonic() + time_limit * 60 if time_limit else None
     
-    with get_db_connection() as conn:
-        proxies = [row['proxy'] for row in conn.execute('SELECT proxy FROM proxies')]
-        total = len(proxies)
-        if total == 0:
-            return 0
+    proxies = get_check_queue(countries)
+    total = len(proxies)
+    if total == 0:
+        return (0, 0, 0)
     
     update_batch = []
     active_count = 0
+    checked = 0
+    queue = iter(proxies)
+    
+    def submit_next(executor, running):
+        # Worst case a probe takes about three timeouts (type detection + final request)
+        timeout = 10
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining < 3:
+                return False
+            timeout = min(timeout, remaining / 3)
+        proxy = next(queue, None)
+        if proxy is None:
+            return False
+        running.add(executor.submit(check_proxy, proxy, reader, timeout))
+        return True
     
     with ThreadPoolExecutor(max_workers=threads) as executor:
-        futures = {executor.submit(check_proxy, p, reader): p for p in proxies}
+        running = set()
+        while len(running) < threads and submit_next(executor, running):
+            pass
         
-        for i, future in enumerate(as_completed(futures), 1):
-            proxy, ptype, country, is_active = future.result()
-            update_batch.append((ptype, country, is_active, proxy))
-            if is_active:
-                active_count += 1
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                proxy, ptype, country, is_active, latency = future.result()
+                update_batch.append((ptype, country, is_active, latency, proxy))
+                checked += 1
+                if is_active:
+                    active_count += 1
+                submit_next(executor, running)
             
-            if i % 100 == 0 or i == total:
+            if len(update_batch) >= 100 or not running:
                 with get_db_connection() as conn:
                     conn.executemany('''
                         UPDATE proxies 
-                        SET type = ?, country = ?, is_active = ?, last_check = datetime('now')
+                        SET type = ?, country = COALESCE(?, country), is_active = ?, latency = ?,
+                            last_check = datetime('now')
                         WHERE proxy = ?
                     ''', update_batch)
                     conn.commit()
                 update_batch = []
             
-            if progress_callback and total > 0:
-                progress = int((i / total) * 100)
-                progress_callback(progress)
+            if progress_callback:
+                progress_callback(int((checked / total) * 100))
     
-    return active_count
+    return (active_count, checked, total)
 
 def update_proxies(sources=None, threads=100, progress_callback=None):
     selected_sources = sources if sources else PROXY_SOURCES + load_custom_sources()
@@ -173,11 +218,11 @@ def update_proxies(sources=None, threads=100, progress_callback=None):
         futures = {executor.submit(check_proxy, p, reader): p for p in new_proxies}
         
         for future in as_completed(futures):
-            proxy, ptype, country, is_active = future.result()
+            proxy, ptype, country, is_active, latency = future.result()
             checked += 1
             
             if is_active:
-                working_proxies.append((proxy, ptype, country))
+                working_proxies.append((proxy, ptype, country, latency))
             
             if progress_callback and total > 0:
                 progress = int((checked / total) * 100)
@@ -187,8 +232,8 @@ def update_proxies(sources=None, threads=100, progress_callback=None):
         with get_db_connection() as conn:
             conn.executemany('''
                 INSERT INTO proxies 
-                (proxy, type, country, last_check, is_active) 
-                VALUES (?, ?, ?, datetime('now'), 1)
+                (proxy, type, country, latency, last_check, is_active) 
+                VALUES (?, ?, ?, ?, datetime('now'), 1)
             ''', working_proxies)
             conn.commit()
     
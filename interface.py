@@ -31,17 +31,20 @@ class UpdateThread(QThread):
 
 class CheckThread(QThread):
     progress = pyqtSignal(int)
-    finished = pyqtSignal(int)
+    finished = pyqtSignal(int, int, int)
     error = pyqtSignal(str)
 
-    def __init__(self, threads):
+    def __init__(self, threads, time_limit=0, countries=None):
         super().__init__()
         self.threads = threads
+        self.time_limit = time_limit
+        self.countries = countries
 
     def run(self):
         try:
-            result = config.check_all_proxies(self.threads, self.progress.emit)
-            self.finished.emit(result)
+            result = config.check_all_proxies(self.threads, self.progress.emit,
+                                              self.time_limit, self.countries)
+            self.finished.emit(*result)
         except Exception as e:
             self.error.emit(str(e))
 
@@ -251,7 +254,7 @@ class ProxyManager(QMainWindow):
     def show_check_dialog(self):
         dialog = QDialog(self)
         dialog.setWindowTitle("Check Settings")
-        dialog.setFixedSize(300, 150)
+        dialog.setFixedSize(300, 210)
         
         layout = QVBoxLayout()
         
@@ -263,6 +266,18 @@ class ProxyManager(QMainWindow):
         self.check_threads_spin.setValue(self.config['check_threads'])
         settings_layout.addRow("Threads:", self.check_threads_spin)
         
+        self.check_time_spin = QSpinBox()
+        self.check_time_spin.setRange(0, 1440)
+        self.check_time_spin.setSpecialValueText("No limit")
+        self.check_time_spin.setSuffix(" min")
+        self.check_time_spin.setValue(self.config.get('check_time_limit', 0))
+        settings_layout.addRow("Time limit:", self.check_time_spin)
+        
+        self.check_countries_input = QLineEdit()
+        self.check_countries_input.setPlaceholderText("e.g. Germany, France")
+        self.check_countries_input.setText(', '.join(self.config.get('check_countries', [])))
+        settings_layout.addRow("Countries first:", self.check_countries_input)
+        
         settings_group.setLayout(settings_layout)
         layout.addWidget(settings_group)
         
@@ -276,17 +291,24 @@ class ProxyManager(QMainWindow):
 
     def start_check(self, dialog):
         threads = self.check_threads_spin.value()
+        time_limit = self.check_time_spin.value()
+        countries = [c.strip() for c in self.check_countries_input.text().split(',') if c.strip()]
         self.config['check_threads'] = threads
+        self.config['check_time_limit'] = time_limit
+        self.config['check_countries'] = countries
         self.save_config()
         
         dialog.close()
-        self.console.append(f"Checking proxies using {threads} threads...")
+        if time_limit:
+            self.console.append(f"Checking proxies using {threads} threads for up to {time_limit} min...")
+        else:
+            self.console.append(f"Checking proxies using {threads} threads...")
         self.toggle_buttons(False)
         self.progress.show()
         self.progress.setRange(0, 100)
         self.progress.setValue(0)
         
-        self.check_thread = CheckThread(threads)
+        self.check_thread = CheckThread(threads, time_limit, countries)
         self.check_thread.progress.connect(self.check_progress)
         self.check_thread.finished.connect(self.check_complete)
         self.check_thread.error.connect(self.check_error)
@@ -403,11 +425,14 @@ class ProxyManager(QMainWindow):
         self.toggle_buttons(True)
         self.load_data()
 
-    def check_complete(self, count):
+    def check_complete(self, count, checked, total):
         self.progress.setValue(100)  # Устанавливаем на 100% при завершении
         QTimer.singleShot(1000, self.progress.hide)
         self.progress.hide()
-        self.console.append(f"Check complete. Active proxies: {count}")
+        if checked < total:
+            self.console.append(f"Checked {checked} of {total} proxies before time limit. Active proxies: {count}")
+        else:
+            self.console.append(f"Check complete. Active proxies: {count}")
         self.toggle_buttons(True)
         self.load_data()
 